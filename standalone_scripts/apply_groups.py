@@ -5,51 +5,158 @@
 By default, groups open as new browser windows (one window per group).
 """
 import argparse
+import functools
+import hashlib
 import json
 import os
+import pickle
 import platform
+import shutil
+import signal
 import subprocess
 import sys
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, TypedDict
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
-def load_graph(path: str) -> Dict:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+TAB_FIELDS = ("id", "url", "browser")
+GROUP_FIELDS = ("id", "tab_ids")
+
+
+class TabRecord(TypedDict, total=False):
+    id: int
+    url: Optional[str]
+    browser: Optional[str]
+
+
+class GroupRecord(TypedDict, total=False):
+    id: int
+    tab_ids: List[int]
+
+
+class GraphRecord(TypedDict, total=False):
+    tabs: List[TabRecord]
+    groups: List[GroupRecord]
+
+
+SYSTEM = platform.system().lower()
+WINDOWS_INSTALL_ROOTS = tuple(
+    root
+    for root in (os.environ.get(var, "") for var in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA"))
+    if root
+)
+
+
+def stream_graph(path: str) -> Dict:
+    """Stream-parse only the tab and group fields needed to open windows."""
+    try:
+        import ijson
+    except ImportError:
+        print("[ERROR] Missing dependency: ijson. Install with: pip install ijson", file=sys.stderr)
+        raise
+    with open(path, "rb") as f:
+        tabs = [{k: t.get(k) for k in TAB_FIELDS} for t in ijson.items(f, "tabs.item")]
+        f.seek(0)
+        groups = [{k: g.get(k) for k in GROUP_FIELDS} for g in ijson.items(f, "groups.item")]
+    return {"tabs": tabs, "groups": groups}
+
+
+def parse_graph(path: str, stream: bool = False) -> Dict:
+    """Load the graph, keeping only tab/group fields when a typed decoder is available."""
+    if stream:
+        return stream_graph(path)
+    if msgspec is not None:
+        # Decoding into TypedDicts validates the schema and skips unused fields
+        # (summaries, embeddings, edges) in one C pass.
+        with open(path, "rb") as f:
+            return msgspec.json.decode(f.read(), type=GraphRecord)
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def user_cache_dir() -> str:
+    if SYSTEM == "windows":
+        root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif SYSTEM == "darwin":
+        root = os.path.expanduser("~/Library/Caches")
+    else:
+        root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, "weft", "graphs")
+
+
+def graph_cache_path(path: str) -> str:
+    # Pickles execute code on load, so they live in a per-user directory rather than
+    # next to the graph, where someone else might be able to write.
+    digest = hashlib.sha256(os.path.realpath(path).encode("utf-8")).hexdigest()[:32]
+    return os.path.join(user_cache_dir(), digest + ".pkl")
+
+
+def load_graph(path: str, stream: bool = False, use_cache: bool = True, write_cache: bool = True) -> Dict:
+    """Load the graph, reusing a pickled copy when the JSON file is unchanged."""
+    if not use_cache:
+        return parse_graph(path, stream)
+    st = os.stat(path)
+    # --stream keeps only the needed fields, so it must not reuse a full parse (or vice versa).
+    key = (os.path.realpath(path), st.st_mtime_ns, st.st_size, stream)
+    cache_path = graph_cache_path(path)
+    try:
+        with open(cache_path, "rb") as f:
+            if pickle.load(f) == key:
+                return pickle.load(f)
+    except Exception:
+        # Missing, unreadable or corrupt caches are just misses.
+        pass
+    graph = parse_graph(path, stream)
+    if not write_cache:
+        return graph
+    try:
+        os.makedirs(os.path.dirname(cache_path), mode=0o700, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as exc:
+        print(f"[WARN] Could not write graph cache {cache_path}: {exc}", file=sys.stderr)
+    return graph
+
+
+@functools.lru_cache(maxsize=1)
 def find_chrome_path() -> Optional[str]:
-    system = platform.system().lower()
-    if system == "darwin":
+    if SYSTEM == "darwin":
         candidate = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
-        return candidate if os.path.exists(candidate) else None
-    if system == "windows":
-        candidates = [
-            os.path.join(os.environ.get("PROGRAMFILES", ""), "Google", "Chrome", "Application", "chrome.exe"),
-            os.path.join(os.environ.get("PROGRAMFILES(X86)", ""), "Google", "Chrome", "Application", "chrome.exe"),
-            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Google", "Chrome", "Application", "chrome.exe"),
-        ]
-        for candidate in candidates:
-            if candidate and os.path.exists(candidate):
+        if os.path.exists(candidate):
+            return candidate
+    elif SYSTEM == "windows":
+        for root in WINDOWS_INSTALL_ROOTS:
+            candidate = os.path.join(root, "Google", "Chrome", "Application", "chrome.exe")
+            if os.path.exists(candidate):
                 return candidate
-    return None
+    return shutil.which("chrome") or shutil.which("google-chrome")
 
 
+@functools.lru_cache(maxsize=1)
 def find_firefox_path() -> Optional[str]:
-    system = platform.system().lower()
-    if system == "darwin":
+    if SYSTEM == "darwin":
         candidate = "/Applications/Firefox.app/Contents/MacOS/firefox"
-        return candidate if os.path.exists(candidate) else None
-    if system == "windows":
-        candidates = [
-            os.path.join(os.environ.get("PROGRAMFILES", ""), "Mozilla Firefox", "firefox.exe"),
-            os.path.join(os.environ.get("PROGRAMFILES(X86)", ""), "Mozilla Firefox", "firefox.exe"),
-            os.path.join(os.environ.get("LOCALAPPDATA", ""), "Mozilla Firefox", "firefox.exe"),
-        ]
-        for candidate in candidates:
-            if candidate and os.path.exists(candidate):
+        if os.path.exists(candidate):
+            return candidate
+    elif SYSTEM == "windows":
+        for root in WINDOWS_INSTALL_ROOTS:
+            candidate = os.path.join(root, "Mozilla Firefox", "firefox.exe")
+            if os.path.exists(candidate):
                 return candidate
-    return None
+    return shutil.which("firefox")
 
 
 def build_firefox_args(urls: List[str]) -> List[str]:
@@ -61,69 +168,146 @@ def build_firefox_args(urls: List[str]) -> List[str]:
     return args
 
 
-def open_chrome_window(urls: List[str], chrome_path: Optional[str], dry_run: bool) -> None:
-    if not urls:
-        return
-    system = platform.system().lower()
-    if system == "darwin":
-        if chrome_path and os.path.exists(chrome_path):
+def chrome_command(urls: List[str], chrome_path: Optional[str]) -> List[str]:
+    if SYSTEM == "darwin":
+        # Exec the app binary directly; "open -na" adds a LaunchServices round-trip.
+        chrome_path = chrome_path or find_chrome_path()
+        if chrome_path:
             cmd = [chrome_path, "--new-window"] + urls
         else:
             cmd = ["open", "-na", "Google Chrome", "--args", "--new-window"] + urls
-    elif system == "windows":
+    elif SYSTEM == "windows":
         chrome_path = chrome_path or find_chrome_path()
         if not chrome_path:
             raise FileNotFoundError("Chrome executable not found. Use --chrome-path to set it.")
         cmd = [chrome_path, "--new-window"] + urls
     else:
         raise RuntimeError("Unsupported OS for Chrome automation.")
-
-    if dry_run:
-        print("[DRY]", " ".join(cmd))
-        return
-    subprocess.Popen(cmd)
+    return cmd
 
 
-def open_firefox_window(urls: List[str], firefox_path: Optional[str], dry_run: bool) -> None:
-    if not urls:
-        return
-    system = platform.system().lower()
+def firefox_command(urls: List[str], firefox_path: Optional[str]) -> List[str]:
+    # One launch per group: Firefox handles every -new-window flag before any -new-tab,
+    # and each -new-tab goes to the top-most window, so merged groups would share a window.
     args = build_firefox_args(urls)
-    if system == "darwin":
-        if firefox_path and os.path.exists(firefox_path):
+    if SYSTEM == "darwin":
+        firefox_path = firefox_path or find_firefox_path()
+        if firefox_path:
             cmd = [firefox_path] + args
         else:
             cmd = ["open", "-na", "Firefox", "--args"] + args
-    elif system == "windows":
+    elif SYSTEM == "windows":
         firefox_path = firefox_path or find_firefox_path()
         if not firefox_path:
             raise FileNotFoundError("Firefox executable not found. Use --firefox-path to set it.")
         cmd = [firefox_path] + args
     else:
         raise RuntimeError("Unsupported OS for Firefox automation.")
+    return cmd
+
+
+# Signals Python ignores at start-up; Popen's restore_signals resets them for the child.
+SPAWN_DEFAULT_SIGNALS = tuple(getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ") if hasattr(signal, name))
+
+
+def inherited_fds() -> List[int]:
+    """Descriptors above stderr that a child would inherit (what Popen's close_fds closes)."""
+    fd_dir = "/dev/fd" if os.path.isdir("/dev/fd") else "/proc/self/fd"
+    fds = []
+    for name in os.listdir(fd_dir):
+        fd = int(name)
+        try:
+            if fd > 2 and os.get_inheritable(fd):
+                fds.append(fd)
+        except OSError:
+            # The descriptor listdir used to read the directory, already closed.
+            pass
+    return fds
 
+
+def spawn_command(cmd: List[str]) -> None:
+    # We never wait on or read from the browser, so skip the Popen machinery.
+    # Either way the browser is detached into its own session, as "open" did, so
+    # closing the terminal (SIGHUP) does not quit it.
+    if hasattr(os, "posix_spawnp"):
+        try:
+            os.posix_spawnp(
+                cmd[0],
+                cmd,
+                os.environ,
+                file_actions=[(os.POSIX_SPAWN_CLOSE, fd) for fd in inherited_fds()],
+                setsigdef=SPAWN_DEFAULT_SIGNALS,
+                setsid=True,
+            )
+            return
+        except NotImplementedError:
+            pass
+    flags = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+    subprocess.Popen(cmd, creationflags=flags, close_fds=True, start_new_session=True)
+
+
+def launch_commands(cmds: List[List[str]], dry_run: bool) -> None:
+    if not cmds:
+        return
     if dry_run:
-        print("[DRY]", " ".join(cmd))
+        for cmd in cmds:
+            print("[DRY]", " ".join(cmd))
+        return
+    # Spawning returns right after the child starts, so a thread pool overlaps the launches.
+    workers = min(len(cmds), (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        list(ex.map(spawn_command, cmds))
+
+
+def open_chrome_window(urls: List[str], chrome_path: Optional[str], dry_run: bool) -> None:
+    if not urls:
+        return
+    launch_commands([chrome_command(urls, chrome_path)], dry_run)
+
+
+def open_firefox_window(urls: List[str], firefox_path: Optional[str], dry_run: bool) -> None:
+    if not urls:
         return
-    subprocess.Popen(cmd)
+    launch_commands([firefox_command(urls, firefox_path)], dry_run)
 
 
-def iter_group_tabs(graph: Dict, browser: Optional[str], group_id: Optional[int]) -> List[Tuple[Dict, List[Dict]]]:
-    tabs = graph.get("tabs", [])
-    tab_by_id = {t.get("id"): t for t in tabs}
-    output = []
-    for group in graph.get("groups", []):
-        if group_id is not None and group.get("id") != group_id:
+def build_index(graph: Dict) -> Tuple[Dict[int, Dict], List[Dict]]:
+    tab_by_id = {t.get("id"): t for t in graph.get("tabs", [])}
+    return tab_by_id, graph.get("groups", [])
+
+
+def select_groups(groups: List[Dict], group_id: Optional[int]) -> List[Dict]:
+    if group_id is None:
+        return groups
+    # Group ids are unique, so stop at the first match.
+    for group in groups:
+        if group.get("id") == group_id:
+            return [group]
+    return []
+
+
+def select_urls(group: Dict, tab_by_id: Dict[int, Dict], all_tabs: bool) -> Tuple[List[str], List[str]]:
+    """Return (chrome_urls, firefox_urls) for a group in a single pass over its tabs."""
+    chrome_urls: List[str] = []
+    firefox_urls: List[str] = []
+    get_tab = tab_by_id.get
+    for tid in group.get("tab_ids", []):
+        tab = get_tab(tid)
+        if not tab:
             continue
-        tab_ids = group.get("tab_ids", [])
-        group_tabs = [tab_by_id.get(tid) for tid in tab_ids]
-        group_tabs = [t for t in group_tabs if t]
-        if browser:
-            group_tabs = [t for t in group_tabs if t.get("browser") == browser]
-        urls = [t.get("url") for t in group_tabs if t.get("url")]
-        if urls:
-            output.append((group, group_tabs))
-    return output
+        url = tab.get("url")
+        if not url:
+            continue
+        if all_tabs:
+            chrome_urls.append(url)
+            firefox_urls.append(url)
+            continue
+        browser = tab.get("browser")
+        if browser == "chrome":
+            chrome_urls.append(url)
+        elif browser == "firefox":
+            firefox_urls.append(url)
+    return chrome_urls, firefox_urls
 
 
 def main() -> None:
@@ -136,25 +320,28 @@ def main() -> None:
     ap.add_argument("--group", type=int, help="Open a single group by id")
     ap.add_argument("--all-tabs", action="store_true", help="Open all tabs in the selected browser(s)")
     ap.add_argument("--dry-run", action="store_true", help="Print commands without launching")
+    ap.add_argument("--stream", action="store_true", help="Stream-parse the graph to reduce memory (requires ijson)")
+    ap.add_argument("--no-cache", action="store_true", help="Do not read or write the parsed graph cache (kept in the user cache directory)")
     args = ap.parse_args()
 
     if not args.chrome and not args.firefox:
         args.chrome = True
         args.firefox = True
 
-    graph = load_graph(args.graph_json)
-
-    if args.chrome:
-        groups = iter_group_tabs(graph, None if args.all_tabs else "chrome", args.group)
-        for group, tabs in groups:
-            urls = [t.get("url") for t in tabs if t.get("url")]
-            open_chrome_window(urls, args.chrome_path, args.dry_run)
+    graph = load_graph(
+        args.graph_json, stream=args.stream, use_cache=not args.no_cache, write_cache=not args.dry_run
+    )
 
-    if args.firefox:
-        groups = iter_group_tabs(graph, None if args.all_tabs else "firefox", args.group)
-        for group, tabs in groups:
-            urls = [t.get("url") for t in tabs if t.get("url")]
-            open_firefox_window(urls, args.firefox_path, args.dry_run)
+    tab_by_id, groups = build_index(graph)
+    chrome_cmds: List[List[str]] = []
+    firefox_cmds: List[List[str]] = []
+    for group in select_groups(groups, args.group):
+        chrome_urls, firefox_urls = select_urls(group, tab_by_id, args.all_tabs)
+        if args.chrome and chrome_urls:
+            chrome_cmds.append(chrome_command(chrome_urls, args.chrome_path))
+        if args.firefox and firefox_urls:
+            firefox_cmds.append(firefox_command(firefox_urls, args.firefox_path))
+    launch_commands(chrome_cmds + firefox_cmds, args.dry_run)
 
     print("[OK] Opened groups.")
 
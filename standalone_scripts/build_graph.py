@@ -6,27 +6,56 @@ Usage:
   python3 build_graph.py tabs_backup.json --out tab_graph.json --llm-backend ollama --ollama-model llama3.1:8b
 """
 import argparse
+import functools
 import hashlib
+import html as html_lib
 import json
-import math
 import os
 import re
 import sys
+import threading
 import time
 from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from html.parser import HTMLParser
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
 import requests
 
+try:
+    import numpy as np
+except Exception as exc:
+    print("[ERROR] Missing dependency: numpy. Install with: pip install numpy", file=sys.stderr)
+    raise
+
 try:
     import trafilatura
 except Exception as exc:
     print("[ERROR] Missing dependency: trafilatura. Install with: pip install trafilatura", file=sys.stderr)
     raise
 
-STOPWORDS = {
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+STOPWORDS = frozenset({
     "a", "about", "above", "after", "again", "against", "all", "am", "an", "and", "any", "are",
     "as", "at", "be", "because", "been", "before", "being", "below", "between", "both", "but",
     "by", "can", "did", "do", "does", "doing", "down", "during", "each", "few", "for", "from",
@@ -39,7 +68,7 @@ STOPWORDS = {
     "under", "until", "up", "very", "was", "we", "were", "what", "when", "where", "which",
     "while", "who", "whom", "why", "with", "would", "you", "your", "yours", "yourself",
     "yourselves",
-}
+})
 
 TRACKING_PARAMS = {
     "fbclid",
@@ -58,6 +87,28 @@ TRACKING_PARAMS = {
 }
 
 
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+HEAD_END_RE = re.compile(r"</head\s*>", re.IGNORECASE)
+# Tokenizes the head into comments, script/style blocks (skipped whole, so "<link ...>"
+# text inside them is ignored) and start tags with quote-aware attribute text. An
+# unterminated comment or block (cut off by the </head> slice) runs to the end.
+HEAD_TOKEN_RE = re.compile(
+    r"""<!--.*?(?:-->|\Z)|<(script|style)\b.*?(?:</\1\s*>|\Z)|<([a-zA-Z][^\s/>]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""",
+    re.IGNORECASE | re.DOTALL,
+)
+TAG_ATTR_RE = re.compile(r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+SIMHASH_SHIFTS = np.arange(64, dtype=np.uint64)
+LXML_PARSER = lxml_html.HTMLParser(encoding="utf-8") if lxml_html is not None else None
+# Pages larger than this skip trafilatura when --fast-extract is set.
+FAST_EXTRACT_CHARS = 500_000
+# Recorded in cache entries so simhashes built with a different token hash are recomputed.
+SIMHASH_HASH = "xxh64" if xxhash is not None else "blake2b"
+
+
 class CanonicalLinkParser(HTMLParser):
     def __init__(self) -> None:
         super().__init__()
@@ -75,6 +126,7 @@ class CanonicalLinkParser(HTMLParser):
             self.canonical_href = href.strip()
 
 
+@functools.lru_cache(maxsize=32768)
 def canonicalize_url(url: str) -> str:
     try:
         parsed = urlparse(url)
@@ -102,7 +154,30 @@ def canonicalize_url(url: str) -> str:
     return urlunparse((scheme, netloc, path, "", query, ""))
 
 
+def canonical_href_from_head(head: str) -> Optional[str]:
+    for match in HEAD_TOKEN_RE.finditer(head):
+        tag = match.group(2)
+        if not tag or tag.lower() != "link":
+            continue
+        attr_map: Dict[str, str] = {}
+        for name, dq, sq, bare in TAG_ATTR_RE.findall(match.group(3)):
+            attr_map.setdefault(name.lower(), html_lib.unescape(dq or sq or bare))
+        if "canonical" not in attr_map.get("rel", "").lower().split():
+            continue
+        href = attr_map.get("href", "").strip()
+        if href:
+            return href
+    return None
+
+
 def extract_canonical_url(html: str, base_url: str) -> Optional[str]:
+    # <link rel="canonical"> normally sits in <head>, so try a regex over just that slice;
+    # HTMLParser over the whole document still handles pages where it finds nothing.
+    head_end = HEAD_END_RE.search(html)
+    if head_end:
+        href = canonical_href_from_head(html[: head_end.start()])
+        if href:
+            return urljoin(base_url, href)
     parser = CanonicalLinkParser()
     try:
         parser.feed(html)
@@ -117,6 +192,7 @@ def is_http_url(url: str) -> bool:
     return url.startswith("http://") or url.startswith("https://")
 
 
+@functools.lru_cache(maxsize=32768)
 def normalize_domain(url: str) -> str:
     parsed = urlparse(url)
     domain = parsed.netloc.lower().split(":")[0]
@@ -154,11 +230,33 @@ def load_tabs(path: str) -> List[Dict]:
     return tabs
 
 
+HTTP_LOCAL = threading.local()
+HTTP_SESSIONS: List[requests.Session] = []
+
+
+def http_session() -> requests.Session:
+    """Per-thread pooled session, so crawl workers and Ollama calls reuse keep-alive connections."""
+    session = getattr(HTTP_LOCAL, "session", None)
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        HTTP_LOCAL.session = session
+        HTTP_SESSIONS.append(session)
+    return session
+
+
+def close_http_sessions() -> None:
+    while HTTP_SESSIONS:
+        HTTP_SESSIONS.pop().close()
+
+
 def fetch_html_requests(url: str, timeout: int, user_agent: Optional[str]) -> str:
     headers = {}
     if user_agent:
         headers["User-Agent"] = user_agent
-    resp = requests.get(url, headers=headers, timeout=timeout)
+    resp = http_session().get(url, headers=headers, timeout=timeout)
     resp.raise_for_status()
     content_type = resp.headers.get("content-type", "")
     if "text/html" not in content_type and "application/xhtml+xml" not in content_type:
@@ -166,7 +264,23 @@ def fetch_html_requests(url: str, timeout: int, user_agent: Optional[str]) -> st
     return resp.text
 
 
-def extract_text(html: str, url: str) -> str:
+def strip_html(html: str) -> str:
+    """Collapse an HTML document to its visible text."""
+    if lxml_html is not None:
+        try:
+            doc = lxml_html.fromstring(html.encode("utf-8"), parser=LXML_PARSER)
+            for node in doc.xpath("//script|//style|//noscript"):
+                node.drop_tree()
+            return " ".join(" ".join(doc.itertext()).split())
+        except Exception:
+            pass
+    text = HTML_TAG_RE.sub(" ", html)
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+def extract_text(html: str, url: str, fast: bool = False) -> str:
+    if fast and len(html) > FAST_EXTRACT_CHARS:
+        return strip_html(html)
     text = trafilatura.extract(
         html,
         url=url,
@@ -177,9 +291,7 @@ def extract_text(html: str, url: str) -> str:
     if text:
         return text
     # Fallback for edge cases where trafilatura fails.
-    text = re.sub(r"<[^>]+>", " ", html)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return strip_html(html)
 
 
 def truncate_text(text: str, max_chars: int) -> str:
@@ -222,7 +334,7 @@ def summarize_ollama(prompt: str, model: str, base_url: str, timeout: int) -> st
         "stream": False,
         "options": {"temperature": 0.2, "num_predict": 200},
     }
-    resp = requests.post(url, json=payload, timeout=timeout)
+    resp = http_session().post(url, json=payload, timeout=timeout)
     resp.raise_for_status()
     data = resp.json()
     return (data.get("response") or "").strip()
@@ -231,7 +343,7 @@ def summarize_ollama(prompt: str, model: str, base_url: str, timeout: int) -> st
 def embed_ollama(text: str, model: str, base_url: str, timeout: int) -> Optional[List[float]]:
     url = base_url.rstrip("/") + "/api/embeddings"
     payload = {"model": model, "prompt": text}
-    resp = requests.post(url, json=payload, timeout=timeout)
+    resp = http_session().post(url, json=payload, timeout=timeout)
     resp.raise_for_status()
     data = resp.json()
     if "embedding" in data:
@@ -241,6 +353,21 @@ def embed_ollama(text: str, model: str, base_url: str, timeout: int) -> Optional
     return None
 
 
+def embed_ollama_batch(
+    texts: List[str], model: str, base_url: str, timeout: int
+) -> List[Optional[List[float]]]:
+    url = base_url.rstrip("/") + "/api/embed"
+    payload = {"model": model, "input": texts}
+    resp = http_session().post(url, json=payload, timeout=timeout)
+    if resp.status_code != 404:
+        resp.raise_for_status()
+        embeddings = resp.json().get("embeddings")
+        if embeddings is not None and len(embeddings) == len(texts):
+            return embeddings
+    # Older Ollama servers only expose the single-prompt endpoint.
+    return [embed_ollama(text, model, base_url, timeout) for text in texts]
+
+
 def build_llama(model_path: str, n_ctx: int, n_threads: int, n_gpu_layers: int):
     try:
         from llama_cpp import Llama
@@ -260,30 +387,17 @@ def summarize_llama(llm, prompt: str) -> str:
     return (out.get("choices") or [{}])[0].get("text", "").strip()
 
 
-def cosine_similarity(a: Optional[List[float]], b: Optional[List[float]]) -> float:
-    if not a or not b:
-        return 0.0
-    if len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(y * y for y in b))
-    if norm_a == 0.0 or norm_b == 0.0:
-        return 0.0
-    return dot / (norm_a * norm_b)
-
-
 def fallback_summary(text: str, max_sentences: int = 3) -> str:
     if not text:
         return ""
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    sentences = SENTENCE_END_RE.split(text)
     sentences = [s.strip() for s in sentences if s.strip()]
     return " ".join(sentences[:max_sentences])
 
 
 def tokenize(text: str) -> List[str]:
     text = text.lower()
-    text = re.sub(r"[^a-z0-9]+", " ", text)
+    text = NON_ALNUM_RE.sub(" ", text)
     tokens = [t for t in text.split() if len(t) >= 3 and t not in STOPWORDS]
     return tokens
 
@@ -291,104 +405,190 @@ def tokenize(text: str) -> List[str]:
 def simhash_from_tokens(tokens: List[str]) -> Optional[int]:
     if not tokens:
         return None
-    vector = [0] * 64
-    for token in tokens:
-        digest = hashlib.md5(token.encode("utf-8")).digest()
-        h = int.from_bytes(digest[:8], "big")
-        for i in range(64):
-            if (h >> i) & 1:
-                vector[i] += 1
-            else:
-                vector[i] -= 1
-    value = 0
-    for i, score in enumerate(vector):
-        if score > 0:
-            value |= 1 << i
-    return value
-
-
-def hamming_distance(a: int, b: int) -> int:
-    return (a ^ b).bit_count()
+    if xxhash is not None:
+        hashes = np.fromiter((xxhash.xxh64_intdigest(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    else:
+        digests = b"".join(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest() for token in tokens)
+        hashes = np.frombuffer(digests, dtype=">u8").astype(np.uint64)
+    # Bit i of the simhash is set when more than half of the token hashes have bit i set.
+    bits = (hashes[:, None] >> SIMHASH_SHIFTS) & np.uint64(1)
+    majority = 2 * bits.sum(axis=0) > len(tokens)
+    return int.from_bytes(np.packbits(majority, bitorder="little").tobytes(), "little")
 
 
-def extract_keywords(text: str, max_keywords: int) -> List[str]:
-    tokens = tokenize(text)
-    counts = Counter(tokens)
-    return [w for w, _ in counts.most_common(max_keywords)]
+def hamming_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Elementwise popcount of a ^ b for uint64 hash arrays."""
+    xor = np.bitwise_xor(a, b)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
 
 
-def jaccard(a: List[str], b: List[str]) -> float:
-    set_a, set_b = set(a), set(b)
-    if not set_a or not set_b:
-        return 0.0
-    return len(set_a & set_b) / len(set_a | set_b)
+def keywords_from_tokens(tokens: List[str], max_keywords: int) -> List[str]:
+    return [w for w, _ in Counter(tokens).most_common(max_keywords)]
 
 
-def similarity_score(ta: Dict, tb: Dict, domain_bonus: float) -> float:
-    similarity = cosine_similarity(ta.get("embedding"), tb.get("embedding"))
-    if similarity == 0.0:
-        similarity = jaccard(ta.get("keywords", []), tb.get("keywords", []))
-    if ta.get("domain") and ta.get("domain") == tb.get("domain"):
-        similarity += domain_bonus
-    return similarity
+def extract_keywords(text: str, max_keywords: int) -> List[str]:
+    return keywords_from_tokens(tokenize(text), max_keywords)
 
 
-def build_similarity_matrix(tabs: List[Dict], domain_bonus: float) -> List[List[float]]:
+def build_similarity_matrix(tabs: List[Dict], domain_bonus: float) -> np.ndarray:
     count = len(tabs)
-    matrix = [[0.0 for _ in range(count)] for _ in range(count)]
-    for i in range(count):
-        for j in range(i + 1, count):
-            score = similarity_score(tabs[i], tabs[j], domain_bonus)
-            matrix[i][j] = score
-            matrix[j][i] = score
+    matrix = np.zeros((count, count), dtype=np.float32)
+
+    # Cosine similarity as one GEMM per embedding size (mixed models can't be compared).
+    by_dim: Dict[int, List[int]] = {}
+    for idx, tab in enumerate(tabs):
+        embedding = tab.get("embedding")
+        if embedding:
+            by_dim.setdefault(len(embedding), []).append(idx)
+    for indices in by_dim.values():
+        vectors = np.asarray([tabs[i]["embedding"] for i in indices], dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        matrix[np.ix_(indices, indices)] = vectors @ vectors.T
+    np.fill_diagonal(matrix, 0.0)
+
+    # Pairs without a usable cosine score fall back to keyword Jaccard. Only tabs
+    # that have such a pair take part, so fully embedded sets skip this entirely.
+    fallback = matrix == 0.0
+    np.fill_diagonal(fallback, False)
+    need = np.flatnonzero(fallback.any(axis=1))
+    if need.size:
+        vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, idx in enumerate(need.tolist()):
+            for word in set(tabs[idx].get("keywords", [])):
+                rows.append(row)
+                cols.append(vocab.setdefault(word, len(vocab)))
+        incidence = np.zeros((need.size, len(vocab)), dtype=np.float32)
+        incidence[rows, cols] = 1.0
+        inter = incidence @ incidence.T
+        sizes = incidence.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - inter
+        jaccard_scores = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        block = np.ix_(need, need)
+        sub = matrix[block]
+        sub_fallback = fallback[block]
+        sub[sub_fallback] = jaccard_scores[sub_fallback]
+        matrix[block] = sub
+
+    if domain_bonus:
+        domain_ids: Dict[str, int] = {}
+        codes = np.array(
+            [domain_ids.setdefault(t["domain"], len(domain_ids)) if t.get("domain") else -1 for t in tabs],
+            dtype=np.int64,
+        )
+        same_domain = (codes[:, None] == codes[None, :]) & (codes[:, None] >= 0)
+        np.fill_diagonal(same_domain, False)
+        matrix[same_domain] += np.float32(domain_bonus)
     return matrix
 
 
+def pairs_above(similarity_matrix: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-major (i, j) index arrays for i < j with similarity >= threshold."""
+    return np.nonzero(np.triu(similarity_matrix >= threshold, k=1))
+
+
 def build_edges(
     tabs: List[Dict],
-    similarity_matrix: List[List[float]],
+    similarity_matrix: np.ndarray,
     threshold: float,
 ) -> List[Dict]:
     edges: List[Dict] = []
-    for i in range(len(tabs)):
-        for j in range(i + 1, len(tabs)):
-            weight = similarity_matrix[i][j]
-            if weight >= threshold:
-                reason = "similarity"
-                if tabs[i].get("domain") == tabs[j].get("domain"):
-                    reason = "similarity+domain"
-                edges.append(
-                    {
-                        "source": tabs[i]["id"],
-                        "target": tabs[j]["id"],
-                        "weight": round(weight, 3),
-                        "reason": reason,
-                    }
-                )
+    rows, cols = pairs_above(similarity_matrix, threshold)
+    weights = similarity_matrix[rows, cols].tolist()
+    for i, j, weight in zip(rows.tolist(), cols.tolist(), weights):
+        reason = "similarity"
+        if tabs[i].get("domain") == tabs[j].get("domain"):
+            reason = "similarity+domain"
+        edges.append(
+            {
+                "source": tabs[i]["id"],
+                "target": tabs[j]["id"],
+                "weight": round(weight, 3),
+                "reason": reason,
+            }
+        )
     return edges
 
 
+def knn_mask(similarity_matrix: np.ndarray, knn_k: int) -> np.ndarray:
+    """Boolean mask of each row's top-k neighbours (self excluded, ties to the lower index)."""
+    count = similarity_matrix.shape[0]
+    scores = similarity_matrix.copy()
+    np.fill_diagonal(scores, -np.inf)
+    if knn_k <= 0 or knn_k >= count - 1:
+        mask = np.ones((count, count), dtype=bool)
+        np.fill_diagonal(mask, False)
+        return mask
+    kth = -np.partition(-scores, knn_k - 1, axis=1)[:, knn_k - 1 : knn_k]
+    mask = scores > kth
+    ties = scores == kth
+    missing = knn_k - mask.sum(axis=1)
+    for i in np.flatnonzero(missing > 0):
+        mask[i, np.flatnonzero(ties[i])[: missing[i]]] = True
+    return mask
+
+
+def uf_find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def uf_union_pairs(parent, rows, cols):
+    for k in range(len(rows)):
+        ra = uf_find(parent, rows[k])
+        rb = uf_find(parent, cols[k])
+        if ra != rb:
+            parent[rb] = ra
+
+
+def uf_roots(parent):
+    roots = np.empty(len(parent), dtype=np.int64)
+    for x in range(len(parent)):
+        roots[x] = uf_find(parent, x)
+    return roots
+
+
+if njit is not None:
+    # Compiled union-find; the pure-Python versions above are the fallback.
+    uf_find = njit(cache=True)(uf_find)
+    uf_union_pairs = njit(cache=True)(uf_union_pairs)
+    uf_roots = njit(cache=True)(uf_roots)
+
+
+def uf_parent(count: int):
+    """Fresh union-find forest: an int64 array for numba, a plain list otherwise."""
+    if njit is not None:
+        return np.arange(count, dtype=np.int64)
+    return list(range(count))
+
+
+def union_pairs(parent, rows: np.ndarray, cols: np.ndarray) -> None:
+    if njit is None:
+        rows, cols = rows.tolist(), cols.tolist()
+    uf_union_pairs(parent, rows, cols)
+
+
+def collect_components(count: int, parent) -> Dict[int, List[int]]:
+    """Map each union-find root to its member indices, in index order."""
+    components: Dict[int, List[int]] = {}
+    for idx, root in enumerate(uf_roots(parent).tolist()):
+        components.setdefault(root, []).append(idx)
+    return components
+
+
 def build_groups(
     tabs: List[Dict],
-    similarity_matrix: List[List[float]],
+    similarity_matrix: np.ndarray,
     threshold: float,
     domain_group: bool,
     domain_group_min: int,
     mutual_knn: bool,
     knn_k: int,
 ) -> Tuple[List[Dict], Dict[int, int]]:
-    parent = list(range(len(tabs)))
-
-    def find(x: int) -> int:
-        while parent[x] != x:
-            parent[x] = parent[parent[x]]
-            x = parent[x]
-        return x
-
-    def union(a: int, b: int) -> None:
-        ra, rb = find(a), find(b)
-        if ra != rb:
-            parent[rb] = ra
+    parent = uf_parent(len(tabs))
 
     if domain_group:
         domain_map: Dict[str, List[int]] = {}
@@ -398,33 +598,17 @@ def build_groups(
                 domain_map.setdefault(domain, []).append(idx)
         for indices in domain_map.values():
             if len(indices) >= max(2, domain_group_min):
-                root = indices[0]
-                for idx in indices[1:]:
-                    union(root, idx)
+                members = np.array(indices[1:], dtype=np.int64)
+                union_pairs(parent, np.full(len(members), indices[0], dtype=np.int64), members)
 
     if mutual_knn:
-        neighbors = []
-        for i in range(len(tabs)):
-            scored = [(j, similarity_matrix[i][j]) for j in range(len(tabs)) if j != i]
-            scored.sort(key=lambda t: t[1], reverse=True)
-            filtered = [j for j, score in scored if score >= threshold]
-            if knn_k > 0:
-                filtered = filtered[:knn_k]
-            neighbors.append(set(filtered))
-        for i in range(len(tabs)):
-            for j in neighbors[i]:
-                if i in neighbors[j]:
-                    union(i, j)
+        neighbors = knn_mask(similarity_matrix, knn_k) & (similarity_matrix >= threshold)
+        rows, cols = np.nonzero(np.triu(neighbors & neighbors.T, k=1))
     else:
-        for i in range(len(tabs)):
-            for j in range(i + 1, len(tabs)):
-                if similarity_matrix[i][j] >= threshold:
-                    union(i, j)
+        rows, cols = pairs_above(similarity_matrix, threshold)
+    union_pairs(parent, rows, cols)
 
-    groups_map: Dict[int, List[int]] = {}
-    for idx in range(len(tabs)):
-        root = find(idx)
-        groups_map.setdefault(root, []).append(idx)
+    groups_map = collect_components(len(tabs), parent)
 
     groups: List[Dict] = []
     tab_to_group: Dict[int, int] = {}
@@ -447,12 +631,12 @@ def compute_idf(docs_tokens: List[List[str]]) -> Dict[str, float]:
     doc_count = len(docs_tokens)
     df = Counter()
     for tokens in docs_tokens:
-        for token in set(tokens):
-            df[token] += 1
-    idf = {}
-    for token, count in df.items():
-        idf[token] = math.log((1 + doc_count) / (1 + count)) + 1.0
-    return idf
+        df.update(set(tokens))
+    if not df:
+        return {}
+    counts = np.fromiter(df.values(), dtype=np.float64, count=len(df))
+    weights = np.log((1 + doc_count) / (1 + counts)) + 1.0
+    return dict(zip(df.keys(), weights.tolist()))
 
 
 def top_tfidf_terms(tokens: List[str], idf: Dict[str, float], max_terms: int) -> List[str]:
@@ -480,47 +664,80 @@ def label_group(group_tabs: List[Dict], idf: Dict[str, float]) -> str:
     return "group"
 
 
-def dedupe_tabs(tabs: List[Dict], hamming_threshold: int) -> Tuple[Dict[int, int], int]:
-    parent = list(range(len(tabs)))
+def simhash_bands(bands: int) -> List[Tuple[int, int]]:
+    """Split the 64 simhash bits into `bands` contiguous (shift, mask) ranges."""
+    out = []
+    shift = 0
+    for band in range(bands):
+        width = 64 // bands + (1 if band < 64 % bands else 0)
+        out.append((shift, (1 << width) - 1))
+        shift += width
+    return out
+
+
+def simhash_candidate_pairs(tabs: List[Dict], hamming_threshold: int) -> List[Tuple[int, int]]:
+    """Same-domain pairs (i < j) that may be within `hamming_threshold` bits.
+
+    Two hashes that differ in at most k bits agree exactly on at least one of k + 1
+    bands, so only pairs sharing a band bucket need an exact Hamming check.
+    """
+    if hamming_threshold < 0:
+        return []
+    by_domain: Dict[str, List[int]] = {}
+    for i, t in enumerate(tabs):
+        if t.get("simhash") is not None and t.get("domain"):
+            by_domain.setdefault(t["domain"], []).append(i)
+    if hamming_threshold >= 64:
+        # Every bit may differ, so all same-domain pairs are candidates; pairing
+        # within each domain bucket avoids scanning cross-domain pairs at all.
+        pairs = []
+        for members in by_domain.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1 :]:
+                    pairs.append((i, j))
+        return sorted(pairs)
+
+    candidates = set()
+    for band, (shift, mask) in enumerate(simhash_bands(hamming_threshold + 1)):
+        for members in by_domain.values():
+            if len(members) < 2:
+                continue
+            buckets: Dict[int, List[int]] = {}
+            for i in members:
+                buckets.setdefault((tabs[i]["simhash"] >> shift) & mask, []).append(i)
+            for bucket in buckets.values():
+                for pos, i in enumerate(bucket):
+                    for j in bucket[pos + 1 :]:
+                        candidates.add((i, j))
+    return sorted(candidates)
 
-    def find(x: int) -> int:
-        while parent[x] != x:
-            parent[x] = parent[parent[x]]
-            x = parent[x]
-        return x
 
-    def union(a: int, b: int) -> None:
-        ra, rb = find(a), find(b)
-        if ra != rb:
-            parent[rb] = ra
+def dedupe_tabs(tabs: List[Dict], hamming_threshold: int) -> Tuple[Dict[int, int], int]:
+    parent = uf_parent(len(tabs))
 
     canonical_map: Dict[str, int] = {}
+    alias_rows: List[int] = []
+    alias_cols: List[int] = []
     for idx, tab in enumerate(tabs):
         canonical = tab.get("canonical_url") or canonicalize_url(tab.get("url", ""))
         if not canonical:
             continue
         tab["canonical_url"] = canonical
         if canonical in canonical_map:
-            union(idx, canonical_map[canonical])
+            alias_rows.append(idx)
+            alias_cols.append(canonical_map[canonical])
         else:
             canonical_map[canonical] = idx
+    union_pairs(parent, np.array(alias_rows, dtype=np.int64), np.array(alias_cols, dtype=np.int64))
 
-    for i in range(len(tabs)):
-        sim_a = tabs[i].get("simhash")
-        if sim_a is None:
-            continue
-        for j in range(i + 1, len(tabs)):
-            sim_b = tabs[j].get("simhash")
-            if sim_b is None:
-                continue
-            if tabs[i].get("domain") and tabs[i].get("domain") == tabs[j].get("domain"):
-                if hamming_distance(sim_a, sim_b) <= hamming_threshold:
-                    union(i, j)
+    pairs = simhash_candidate_pairs(tabs, hamming_threshold)
+    if pairs:
+        hashes = np.array([t.get("simhash") or 0 for t in tabs], dtype=np.uint64)
+        left, right = np.array(pairs, dtype=np.intp).T
+        close = hamming_distances(hashes[left], hashes[right]) <= hamming_threshold
+        union_pairs(parent, left[close].astype(np.int64), right[close].astype(np.int64))
 
-    groups: Dict[int, List[int]] = {}
-    for idx in range(len(tabs)):
-        root = find(idx)
-        groups.setdefault(root, []).append(idx)
+    groups = collect_components(len(tabs), parent)
 
     duplicates = 0
     primary_map: Dict[int, int] = {}
@@ -549,11 +766,114 @@ def dedupe_tabs(tabs: List[Dict], hamming_threshold: int) -> Tuple[Dict[int, int
     return primary_map, duplicates
 
 
+def crawl_tab(
+    url: str,
+    title: str,
+    args,
+    llm,
+    context,
+    llm_slots: threading.BoundedSemaphore,
+    by_canonical: Dict[str, Future],
+    by_canonical_lock: threading.Lock,
+) -> Dict:
+    """Fetch a page and summarize it; errors are returned rather than raised.
+
+    by_canonical maps a canonical URL to the crawl that claimed it first. Later tabs
+    for the same page wait for that result instead of fetching or summarizing again.
+    """
+    with by_canonical_lock:
+        earlier = by_canonical.get(canonicalize_url(url))
+    if earlier is not None and earlier.result() is not None:
+        return earlier.result()
+
+    try:
+        if args.js and context:
+            page = context.new_page()
+            page.goto(url, wait_until="networkidle", timeout=args.timeout * 1000)
+            html = page.content()
+            page.close()
+        else:
+            html = fetch_html_requests(url, args.timeout, args.user_agent)
+    except Exception as exc:
+        return {"fetch_error": f"fetch_failed: {exc}"}
+
+    canonical = extract_canonical_url(html, url)
+    text = extract_text(html, url, args.fast_extract)
+    text = text.strip()
+
+    claim: Optional[Future] = None
+    with by_canonical_lock:
+        earlier = by_canonical.get(canonicalize_url(canonical or url))
+        if earlier is None:
+            claim = by_canonical[canonicalize_url(canonical or url)] = Future()
+    if earlier is not None and earlier.result() is not None:
+        return {**earlier.result(), "canonical": canonical, "text": text}
+
+    result = None
+    try:
+        clipped = truncate_text(text, args.max_chars)
+        prompt = build_prompt(title, clipped)
+        summary = ""
+        summary_source = ""
+        summary_error = None
+
+        try:
+            with llm_slots:
+                if args.llm_backend == "ollama":
+                    summary = summarize_ollama(prompt, args.ollama_model, args.ollama_url, args.ollama_timeout)
+                    summary_source = f"ollama:{args.ollama_model}"
+                else:
+                    summary = summarize_llama(llm, prompt)
+                    summary_source = f"gguf:{os.path.basename(args.gguf or '')}"
+        except Exception as exc:
+            summary = fallback_summary(text)
+            summary_source = "fallback"
+            summary_error = f"summary_failed: {exc}"
+
+        if not summary:
+            summary = fallback_summary(text)
+            summary_source = summary_source or "fallback"
+
+        result = {
+            "canonical": canonical,
+            "text": text,
+            "summary": summary,
+            "summary_source": summary_source,
+            "summary_error": summary_error,
+        }
+        return result
+    finally:
+        if claim is not None:
+            # A failed summary is not shared, so waiting tabs retry the model themselves.
+            claim.set_result(result if result and not result["summary_error"] else None)
+
+
+def embedding_cache_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".npz"
+
+
 def load_cache(path: Optional[str]) -> Dict[str, Dict]:
     if not path or not os.path.exists(path):
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    if orjson is not None:
+        with open(path, "rb") as f:
+            cache = orjson.loads(f.read())
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    npz_path = embedding_cache_path(path)
+    if os.path.exists(npz_path):
+        with np.load(npz_path) as packed:
+            keys = packed["keys"].tolist()
+            rows = packed["rows"].tolist()
+            offsets = packed["offsets"]
+            values = packed["values"]
+        vectors = [values[offsets[r] : offsets[r + 1]].tolist() for r in range(len(offsets) - 1)]
+        for key, row in zip(keys, rows):
+            entry = cache.get(key)
+            if entry is not None and not entry.get("embedding"):
+                entry["embedding"] = vectors[row]
+    return cache
 
 
 def get_cache_entry(cache: Dict[str, Dict], url: str) -> Tuple[Optional[Dict], Optional[str]]:
@@ -565,14 +885,58 @@ def get_cache_entry(cache: Dict[str, Dict], url: str) -> Tuple[Optional[Dict], O
     return None, None
 
 
-def save_cache(path: Optional[str], cache: Dict[str, Dict]) -> None:
+def save_cache(path: Optional[str], cache: Dict[str, Dict], fast: bool = False) -> None:
+    """Write the cache JSON; with `fast`, embeddings go to a packed float32 .npz beside it."""
     if not path:
         return
     dir_name = os.path.dirname(path)
     if dir_name:
         os.makedirs(dir_name, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+    npz_path = embedding_cache_path(path)
+    if not fast:
+        write_json(path + ".tmp", cache)
+        os.replace(path + ".tmp", path)
+        if os.path.exists(npz_path):
+            os.remove(npz_path)
+        return
+
+    # Vectors are shared between canonical and raw-URL keys (and, after load_cache,
+    # between entries that were separate dicts in the JSON); pack each one once.
+    row_by_vector: Dict[int, int] = {}
+    vectors: List[List[float]] = []
+    keys: List[str] = []
+    rows: List[int] = []
+    meta: Dict[str, Dict] = {}
+    for key, entry in cache.items():
+        embedding = entry.get("embedding")
+        if embedding:
+            row = row_by_vector.get(id(embedding))
+            if row is None:
+                row = row_by_vector[id(embedding)] = len(vectors)
+                vectors.append(embedding)
+            keys.append(key)
+            rows.append(row)
+            entry = dict(entry, embedding=None)
+        meta[key] = entry
+    offsets = np.zeros(len(vectors) + 1, dtype=np.int64)
+    np.cumsum([len(v) for v in vectors], out=offsets[1:])
+    values = np.fromiter((x for v in vectors for x in v), dtype=np.float32, count=int(offsets[-1]))
+    with open(npz_path + ".tmp", "wb") as f:
+        np.savez(f, keys=np.array(keys, dtype=str), rows=np.array(rows, dtype=np.int64), offsets=offsets, values=values)
+    write_json(path + ".tmp", meta)
+    os.replace(npz_path + ".tmp", npz_path)
+    os.replace(path + ".tmp", path)
+
+
+def write_json(path: str, data: Dict) -> None:
+    """Write indented UTF-8 JSON, serializing in one C call when orjson is available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+    # json.dump emits one small write per token; a 1 MiB buffer coalesces them.
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
 
 
 def main() -> None:
@@ -581,6 +945,7 @@ def main() -> None:
     ap.add_argument("--out", default="tab_graph.json", help="Output graph JSON path")
     ap.add_argument("--cache", default=os.path.join("data", "tab_graph_cache.json"), help="Cache file path")
     ap.add_argument("--refresh", action="store_true", help="Ignore cache and re-fetch")
+    ap.add_argument("--fast-cache", action="store_true", help="Store cached embeddings in a float32 .npz beside the cache JSON")
     ap.add_argument("--limit", type=int, default=0, help="Limit number of tabs (0 = all)")
     ap.add_argument("--max-chars", type=int, default=6000, help="Max characters sent to LLM")
     ap.add_argument("--embed-max-chars", type=int, default=2000, help="Max characters sent to embed model")
@@ -595,13 +960,16 @@ def main() -> None:
     ap.add_argument("--keyword-count", type=int, default=8, help="Number of keywords per tab")
     ap.add_argument("--user-agent", default="Mozilla/5.0", help="User-Agent for crawling")
     ap.add_argument("--timeout", type=int, default=20, help="HTTP timeout seconds")
+    ap.add_argument("--crawl-workers", type=int, default=8, help="Pages fetched concurrently (1 = serial)")
+    ap.add_argument("--llm-concurrency", type=int, default=2, help="Concurrent Ollama summary requests")
     ap.add_argument("--llm-backend", choices=["ollama", "gguf"], default="ollama", help="LLM backend")
     ap.add_argument("--ollama-model", default="llama3.1:8b", help="Ollama model name")
     ap.add_argument("--ollama-url", default="http://localhost:11434", help="Ollama base URL")
     ap.add_argument("--ollama-timeout", type=int, default=120, help="Ollama request timeout")
     ap.add_argument("--embed-model", default="nomic-embed-text", help="Ollama embedding model name")
     ap.add_argument("--embed-url", default=None, help="Ollama base URL for embeddings")
-    ap.add_argument("--embed-timeout", type=int, default=60, help="Embedding request timeout")
+    ap.add_argument("--embed-timeout", type=int, default=120, help="Embedding request timeout (per batch)")
+    ap.add_argument("--embed-batch-size", type=int, default=32, help="Texts per Ollama embedding request")
     ap.add_argument("--no-embeddings", action="store_true", help="Disable embeddings for similarity")
     ap.add_argument("--store-embeddings", action="store_true", help="Include embeddings in output JSON")
     ap.add_argument("--gguf", help="Path to a GGUF model file for llama-cpp-python")
@@ -609,6 +977,7 @@ def main() -> None:
     ap.add_argument("--llama-n-threads", type=int, default=max(1, os.cpu_count() or 1), help="Threads for llama-cpp")
     ap.add_argument("--llama-n-gpu-layers", type=int, default=0, help="GPU layers for llama-cpp")
     ap.add_argument("--js", action="store_true", help="Use Playwright to render JS-heavy pages")
+    ap.add_argument("--fast-extract", action="store_true", help="Skip trafilatura for very large pages and strip tags directly")
     args = ap.parse_args()
 
     embed_url = args.embed_url or args.ollama_url
@@ -640,11 +1009,43 @@ def main() -> None:
         browser = playwright.chromium.launch(headless=True)
         context = browser.new_context(user_agent=args.user_agent)
 
+    # Fetch and summarize every uncached page up front, overlapping the network waits.
+    # Tabs that canonicalize to the same URL share one crawl.
+    to_crawl: Dict[str, Tuple[str, str]] = {}
+    for tab in tabs:
+        url = tab.get("url")
+        if not url or not is_http_url(url):
+            continue
+        cached, _ = get_cache_entry(cache, url)
+        if cached and not args.refresh:
+            continue
+        to_crawl.setdefault(canonicalize_url(url), (url, tab.get("title", "")))
+
+    # Playwright's sync API and llama-cpp are not thread-safe, so they stay serial.
+    llm_slots = threading.BoundedSemaphore(max(1, args.llm_concurrency) if llm is None else 1)
+    crawled: Dict[str, Dict] = {}
+    by_canonical: Dict[str, Future] = {}
+    by_canonical_lock = threading.Lock()
+
+    def crawl(item: Tuple[str, str]) -> Dict:
+        url, title = item
+        return crawl_tab(url, title, args, llm, context, llm_slots, by_canonical, by_canonical_lock)
+
+    if context or args.crawl_workers <= 1:
+        for key, item in to_crawl.items():
+            crawled[key] = crawl(item)
+    elif to_crawl:
+        workers = min(args.crawl_workers, len(to_crawl))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            crawled = dict(zip(to_crawl, ex.map(crawl, to_crawl.values())))
+
     errors = 0
     embed_errors = 0
     embed_requests = 0
     embed_reused = 0
     embed_skipped = 0
+    embed_pending: Dict[str, List[Tuple[Dict, Optional[Dict]]]] = {}
+    pending_by_entry: Dict[int, str] = {}
     for tab in tabs:
         url = tab.get("url")
         if not url or not is_http_url(url):
@@ -652,9 +1053,11 @@ def main() -> None:
             tab["error"] = "unsupported_url"
             continue
 
+        url_key = canonicalize_url(url)
         cached, _ = get_cache_entry(cache, url)
         used_cache = False
         text = ""
+        embed_key: Optional[str] = None
 
         if cached and not args.refresh:
             tab["summary"] = cached.get("summary", "")
@@ -662,77 +1065,58 @@ def main() -> None:
             tab["keywords"] = cached.get("keywords", [])
             tab["summary_source"] = cached.get("summary_source", "")
             tab["canonical_url"] = cached.get("canonical_url") or tab.get("canonical_url")
-            tab["simhash"] = cached.get("simhash")
+            if cached.get("simhash_hash") == SIMHASH_HASH:
+                tab["simhash"] = cached.get("simhash")
             if embed_enabled and cached.get("embedding") and cached.get("embedding_model") == args.embed_model:
                 tab["embedding"] = cached.get("embedding")
                 embed_reused += 1
+            elif embed_enabled and id(cached) in pending_by_entry:
+                # An earlier tab wrote this entry and its embedding is still queued.
+                embed_key = pending_by_entry[id(cached)]
+                embed_reused += 1
             text = tab.get("text_excerpt", "")
             used_cache = True
 
         if not used_cache:
-            try:
-                if args.js and context:
-                    page = context.new_page()
-                    page.goto(url, wait_until="networkidle", timeout=args.timeout * 1000)
-                    html = page.content()
-                    page.close()
-                else:
-                    html = fetch_html_requests(url, args.timeout, args.user_agent)
-            except Exception as exc:
+            result = crawled[url_key]
+            if result.get("fetch_error"):
                 errors += 1
                 tab["summary"] = ""
-                tab["error"] = f"fetch_failed: {exc}"
+                tab["error"] = result["fetch_error"]
                 continue
 
-            canonical = extract_canonical_url(html, url)
+            canonical = result.get("canonical")
             if canonical:
                 tab["canonical_url"] = canonicalize_url(canonical)
             else:
-                tab["canonical_url"] = tab.get("canonical_url") or canonicalize_url(url)
-
-            text = extract_text(html, url)
-            text = text.strip()
-            clipped = truncate_text(text, args.max_chars)
-            prompt = build_prompt(tab.get("title", ""), clipped)
-            summary = ""
-            summary_source = ""
+                tab["canonical_url"] = tab.get("canonical_url") or url_key
 
-            try:
-                if args.llm_backend == "ollama":
-                    summary = summarize_ollama(prompt, args.ollama_model, args.ollama_url, args.ollama_timeout)
-                    summary_source = f"ollama:{args.ollama_model}"
-                else:
-                    summary = summarize_llama(llm, prompt)
-                    summary_source = f"gguf:{os.path.basename(args.gguf or '')}"
-            except Exception as exc:
+            text = result.get("text", "")
+            summary = result.get("summary", "")
+            if result.get("summary_error"):
                 errors += 1
-                summary = fallback_summary(text)
-                summary_source = "fallback"
-                tab["error"] = f"summary_failed: {exc}"
-
-            if not summary:
-                summary = fallback_summary(text)
-                summary_source = summary_source or "fallback"
+                tab["error"] = result["summary_error"]
 
             tab["summary"] = summary
-            tab["summary_source"] = summary_source
+            tab["summary_source"] = result.get("summary_source", "")
             tab["text_excerpt"] = text[:400]
-            tab["keywords"] = extract_keywords(f"{tab.get('title', '')} {summary}", args.keyword_count)
 
         if not tab.get("canonical_url"):
-            tab["canonical_url"] = canonicalize_url(url)
+            tab["canonical_url"] = url_key
 
-        if not tab.get("keywords"):
-            tab["keywords"] = extract_keywords(f"{tab.get('title', '')} {tab.get('summary', '')}", args.keyword_count)
+        # Keywords come from title + summary, which is also the head of the token
+        # stream, so tokenize it once and only append the excerpt's tokens.
+        head_tokens = tokenize(f"{tab.get('title', '')} {tab.get('summary', '')}")
+        if not used_cache or not tab.get("keywords"):
+            tab["keywords"] = keywords_from_tokens(head_tokens, args.keyword_count)
 
         if "tokens" not in tab:
-            base_text = f"{tab.get('title', '')} {tab.get('summary', '')} {tab.get('text_excerpt', '')}"
-            tab["tokens"] = tokenize(base_text)
+            tab["tokens"] = head_tokens + tokenize(tab.get("text_excerpt", ""))
 
         if tab.get("simhash") is None:
             tab["simhash"] = simhash_from_tokens(tab.get("tokens", []))
 
-        if embed_enabled and tab.get("embedding") is None:
+        if embed_enabled and tab.get("embedding") is None and embed_key is None:
             embed_text = build_embedding_text(
                 tab.get("title", ""),
                 tab.get("summary", ""),
@@ -740,19 +1124,17 @@ def main() -> None:
                 tab.get("text_excerpt", ""),
             )
             embed_text = truncate_text(embed_text, args.embed_max_chars)
-            if embed_text:
-                try:
-                    embed_requests += 1
-                    tab["embedding"] = embed_ollama(embed_text, args.embed_model, embed_url, args.embed_timeout)
-                except Exception as exc:
-                    embed_errors += 1
-                    tab["embedding"] = None
-                    tab["embedding_error"] = str(exc)
-            else:
+            if not embed_text:
                 embed_skipped += 1
+            elif embed_text in embed_pending:
+                embed_key = embed_text
+                embed_reused += 1
+            else:
+                embed_key = embed_text
 
-        cache_key = tab.get("canonical_url") or canonicalize_url(url)
-        alt_key = canonicalize_url(url)
+        cache_key = tab.get("canonical_url") or url_key
+        alt_key = url_key
+        entry = None
         if cache_key:
             entry = {
                 "summary": tab.get("summary", ""),
@@ -761,6 +1143,7 @@ def main() -> None:
                 "keywords": tab.get("keywords", []),
                 "canonical_url": tab.get("canonical_url"),
                 "simhash": tab.get("simhash"),
+                "simhash_hash": SIMHASH_HASH,
                 "embedding": tab.get("embedding"),
                 "embedding_model": args.embed_model,
             }
@@ -768,6 +1151,12 @@ def main() -> None:
             if alt_key and alt_key != cache_key:
                 cache[alt_key] = entry
 
+        if embed_key:
+            # Embeddings are requested in batches once every tab has been summarized.
+            embed_pending.setdefault(embed_key, []).append((tab, entry))
+            if entry is not None:
+                pending_by_entry[id(entry)] = embed_key
+
     if context:
         context.close()
     if browser:
@@ -775,6 +1164,34 @@ def main() -> None:
     if playwright:
         playwright.stop()
 
+    embed_texts = list(embed_pending)
+    batch_size = max(1, args.embed_batch_size)
+    for start in range(0, len(embed_texts), batch_size):
+        batch = embed_texts[start : start + batch_size]
+        embed_requests += len(batch)
+        try:
+            vectors = embed_ollama_batch(batch, args.embed_model, embed_url, args.embed_timeout)
+        except Exception:
+            # A bad input or a transient failure should not cost the whole batch:
+            # retry its texts one at a time and only mark the ones that still fail.
+            vectors = []
+            for text in batch:
+                try:
+                    vector = embed_ollama_batch([text], args.embed_model, embed_url, args.embed_timeout)[0]
+                except Exception as exc:
+                    vector = None
+                    embed_errors += 1
+                    for tab, _ in embed_pending[text]:
+                        tab["embedding_error"] = str(exc)
+                vectors.append(vector)
+        for text, vector in zip(batch, vectors):
+            for tab, entry in embed_pending[text]:
+                tab["embedding"] = vector
+                if entry is not None:
+                    entry["embedding"] = vector
+
+    close_http_sessions()
+
     primary_map, duplicates = dedupe_tabs(tabs, args.dedupe_hamming)
     primary_tabs = [t for t in tabs if t.get("duplicate_of") is None]
     primary_docs = [t.get("tokens", []) for t in primary_tabs]
@@ -842,10 +1259,9 @@ def main() -> None:
         "edges": edges,
     }
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(graph, f, ensure_ascii=False, indent=2)
+    write_json(args.out, graph)
 
-    save_cache(args.cache, cache)
+    save_cache(args.cache, cache, fast=args.fast_cache)
     print(
         f"[OK] Wrote {args.out} with {len(tabs)} tabs, {len(groups)} groups, "
         f"{len(edges)} edges, {duplicates} duplicates, "
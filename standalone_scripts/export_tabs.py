@@ -12,19 +12,31 @@ Usage:
 
 If no browser flags provided, both are attempted (errors are non-fatal).
 '''
-import argparse, json, os, subprocess, sys, configparser, glob, time
+import argparse, json, os, stat, subprocess, sys, configparser, glob, time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 
-def run_jxa(script: str) -> str:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from lz4.block import decompress as lz4_decompress
+except ImportError:
+    lz4_decompress = None
+
+def run_jxa(script: str) -> bytes:
+    # Raw stdout bytes: the JSON parsers below read UTF-8 bytes directly.
     try:
         p = subprocess.run(
             ['osascript', '-l', 'JavaScript', '-e', script],
-            check=True, capture_output=True, text=True
+            check=True, capture_output=True
         )
-        return p.stdout.strip()
+        return p.stdout
     except subprocess.CalledProcessError as e:
-        raise RuntimeError(e.stderr.strip() or str(e))
+        raise RuntimeError(e.stderr.decode('utf-8', 'replace').strip() or str(e))
 
 def export_chrome():
     jxa = '''
@@ -35,10 +47,17 @@ def export_chrome():
       try {
         var chrome = Application('Google Chrome');
         chrome.windows().forEach(function(w){
-          var tabs = w.tabs().map(function(t){ return {title: t.title(), url: t.url()}; });
-          if (tabs.length > 0) {
-            output.push({browser: 'chrome', windowId: w.id(), tabs: tabs});
+          // One count event first, so windows without tabs never fetch titles/urls.
+          if (!w.tabs.length) return;
+          // Element-wise accessors fetch every tab's title/url in one Apple Event each,
+          // instead of two events per tab.
+          var titles = w.tabs.title();
+          var urls = w.tabs.url();
+          var tabs = new Array(urls.length);
+          for (var i = 0; i < urls.length; i++) {
+            tabs[i] = {title: titles[i], url: urls[i]};
           }
+          output.push({browser: 'chrome', windowId: w.id(), tabs: tabs});
         });
       } catch (e) {
         // Chrome not running or AppleScript disabled
@@ -47,55 +66,93 @@ def export_chrome():
     }
     '''
     out = run_jxa(jxa)
-    return json.loads(out) if out else []
+    if not out or out.isspace():
+        return []
+    return orjson.loads(out) if orjson is not None else json.loads(out)
 
 # ---------- Firefox helpers: scan all profiles, pick freshest sessionstore ----------
 
 FF_BASE = Path.home() / 'Library' / 'Application Support' / 'Firefox' / 'Profiles'
 
 def find_all_firefox_profiles() -> List[Path]:
-    if not FF_BASE.exists():
+    # DirEntry.is_dir() answers from the readdir d_type (only symlinks need a stat).
+    try:
+        entries = os.scandir(FF_BASE)
+    except OSError:
         return []
-    return [p for p in FF_BASE.iterdir() if p.is_dir()]
+    with entries:
+        return [Path(e.path) for e in entries if e.is_dir()]
+
+def probe_file(p: Path) -> Optional[Tuple[Path, float]]:
+    """(path, mtime) if p is a regular file, from a single stat() call."""
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return p, st.st_mtime
 
 def best_sessionstore_for_profile(prof: Path) -> Optional[Tuple[Path, float]]:
     """Return (path, mtime) of the freshest sessionstore candidate or None."""
-    candidates = []
     ssb = prof / 'sessionstore-backups'
-    for name in ('recovery.jsonlz4', 'previous.jsonlz4'):
-        p = ssb / name
-        if p.exists():
-            candidates.append(p)
-    candidates.extend((ssb).glob('upgrade.jsonlz4*'))  # historical upgrades
-    p_root = prof / 'sessionstore.jsonlz4'
-    if p_root.exists():
-        candidates.append(p_root)
-    if not candidates:
-        return None
-    candidates = [(p, p.stat().st_mtime) for p in candidates if p.is_file()]
+    candidates = [c for c in map(probe_file, (ssb / 'recovery.jsonlz4', ssb / 'previous.jsonlz4')) if c]
+    # Historical upgrades: one readdir, with the type and mtime taken from the DirEntry.
+    try:
+        with os.scandir(ssb) as entries:
+            for e in entries:
+                if e.name.startswith('upgrade.jsonlz4') and e.is_file():
+                    candidates.append((Path(e.path), e.stat().st_mtime))
+    except OSError:
+        pass
+    root = probe_file(prof / 'sessionstore.jsonlz4')
+    if root:
+        candidates.append(root)
     if not candidates:
         return None
     candidates.sort(key=lambda t: t[1], reverse=True)
     return candidates[0]  # (path, mtime)
 
+# Slack (seconds) when comparing directory mtimes against a sessionstore mtime.
+FF_MTIME_SKEW = 2.0
+
+def session_mtime_bound(prof: Path) -> float:
+    """Upper bound on any sessionstore mtime in prof.
+
+    Firefox writes session files to a temp name and renames them into place, which also
+    bumps the containing directory's mtime.
+    """
+    bound = 0.0
+    for d in (prof, prof / 'sessionstore-backups'):
+        try:
+            bound = max(bound, os.stat(d).st_mtime)
+        except OSError:
+            pass
+    return bound
+
 def choose_firefox_profile_with_fresh_session() -> Optional[Tuple[Path, Path]]:
     """Return (profile_dir, sessionstore_path) with the freshest valid session across all profiles."""
     profiles = find_all_firefox_profiles()
+    # Probe the most recently touched profiles first and stop once no remaining profile
+    # can beat the best session found; usually only the active profile is probed.
+    bounded = sorted(((session_mtime_bound(prof), i, prof) for i, prof in enumerate(profiles)), reverse=True)
     scored = []
-    for prof in profiles:
+    best_mtime = None
+    for bound, i, prof in bounded:
+        if best_mtime is not None and bound + FF_MTIME_SKEW < best_mtime:
+            break
         best = best_sessionstore_for_profile(prof)
         if best:
-            scored.append((prof, best[0], best[1]))  # (profile, path, mtime)
+            scored.append((i, prof, best[0], best[1]))  # (order, profile, path, mtime)
+            best_mtime = best[1] if best_mtime is None else max(best_mtime, best[1])
     if not scored:
         return None
-    scored.sort(key=lambda t: t[2], reverse=True)
-    return scored[0][0], scored[0][1]
+    scored.sort(key=lambda t: (-t[3], t[0]))  # freshest first; ties keep directory order
+    return scored[0][1], scored[0][2]
 
 def export_firefox(profile_override: Optional[str] = None, verbose: bool = False):
-    try:
-        from lz4.block import decompress as lz4_decompress
-    except Exception as e:
-        raise RuntimeError("Python package 'lz4' is required for Firefox export. Install with: pip install lz4") from e
+    if lz4_decompress is None:
+        raise RuntimeError("Python package 'lz4' is required for Firefox export. Install with: pip install lz4")
 
     session_path: Optional[Path] = None
     selected_profile: Optional[Path] = None
@@ -119,27 +176,32 @@ def export_firefox(profile_override: Optional[str] = None, verbose: bool = False
         print(f'[INFO] Using Firefox profile: {selected_profile}')
         print(f'[INFO] Sessionstore file:    {session_path} (mtime={time.ctime(session_path.stat().st_mtime)})')
 
-    raw = session_path.read_bytes()
-    if raw[:8] != b'mozLz40\x00':
-        raise RuntimeError('Unexpected Firefox sessionstore header; not mozlz4.')
+    # Read the 8-byte magic separately so the compressed payload is never sliced (copied),
+    # and parse the decompressed bytes directly instead of decoding them to str first.
+    with session_path.open('rb') as fh:
+        if fh.read(8) != b'mozLz40\x00':
+            raise RuntimeError('Unexpected Firefox sessionstore header; not mozlz4.')
+        comp = fh.read()
 
-    from lz4.block import decompress as lz4_decompress  # local import kept above for error message
-    decomp = lz4_decompress(raw[8:])
-    session = json.loads(decomp.decode('utf-8'))
+    decomp = lz4_decompress(comp)
+    del comp
+    session = orjson.loads(decomp) if orjson is not None else json.loads(decomp)
+    del decomp
 
     windows = session.get('windows', [])
     payload = []
     for w in windows:
         tabs = []
-        for t in w.get('tabs', []):
-            idx = t.get('index', 1)
-            entries = t.get('entries', [])
-            if 1 <= idx <= len(entries):
-                e = entries[idx-1]
-                url = e.get('url', '')
-                title = e.get('title', '')
+        for t in w.get('tabs', ()):
+            entries = t.get('entries')
+            if not entries:
+                continue
+            idx = t.get('index', 1) - 1
+            if 0 <= idx < len(entries):
+                e = entries[idx]
+                url = e.get('url')
                 if url:
-                    tabs.append({'title': title, 'url': url})
+                    tabs.append({'title': e.get('title', ''), 'url': url})
         if tabs:
             payload.append({'browser': 'firefox', 'windowId': None, 'tabs': tabs})
     return payload
@@ -150,6 +212,7 @@ def main():
     ap.add_argument('--firefox', action='store_true', help='Export Firefox windows/tabs')
     ap.add_argument('--firefox-profile', help='Override: path to a specific Firefox profile directory')
     ap.add_argument('--out', default='tabs_backup.json', help='Output JSON file path')
+    ap.add_argument('--durable', action='store_true', help='fsync the output file before exiting')
     ap.add_argument('-v', '--verbose', action='store_true', help='Verbose logging')
     args = ap.parse_args()
 
@@ -158,26 +221,39 @@ def main():
         args.firefox = True
 
     all_data = []
+    total_tabs = 0
     had_error = False
 
-    if args.chrome:
-        try:
-            all_data.extend(export_chrome())
-        except Exception as e:
-            had_error = True
-            print(f'[WARN] Chrome export failed: {e}', file=sys.stderr)
+    # Both exports block on I/O (osascript / sessionstore read + lz4), so overlap them.
+    # Results are still collected Chrome first, then Firefox.
+    futs = {}
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        if args.chrome:
+            futs['Chrome'] = ex.submit(export_chrome)
+        if args.firefox:
+            futs['Firefox'] = ex.submit(export_firefox, args.firefox_profile, args.verbose)
+        for name, fut in futs.items():
+            try:
+                data = fut.result()
+            except Exception as e:
+                had_error = True
+                print(f'[WARN] {name} export failed: {e}', file=sys.stderr)
+                continue
+            all_data.extend(data)
+            total_tabs += sum(len(w['tabs']) for w in data)
 
-    if args.firefox:
-        try:
-            all_data.extend(export_firefox(args.firefox_profile, args.verbose))
-        except Exception as e:
-            had_error = True
-            print(f'[WARN] Firefox export failed: {e}', file=sys.stderr)
-
-    with open(args.out, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    # Serialize once and hand the kernel a single write; no fsync unless --durable.
+    if orjson is not None:
+        buf = orjson.dumps(all_data, option=orjson.OPT_INDENT_2)
+    else:
+        buf = json.dumps(all_data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(args.out, 'wb') as f:
+        f.write(buf)
+        if args.durable:
+            f.flush()
+            os.fsync(f.fileno())
 
-    print(f'[OK] Wrote {args.out} with {sum(len(w.get("tabs", [])) for w in all_data)} tabs across {len(all_data)} windows.')
+    print(f'[OK] Wrote {args.out} with {total_tabs} tabs across {len(all_data)} windows.')
     if had_error:
         print('[NOTE] Some browsers failed to export; see warnings above.', file=sys.stderr)
 
@@ -1,15 +1,32 @@
 """Process raw tab export into a weft graph."""
 
+import argparse
 import json
 import sys
 sys.path.insert(0, '.')
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from weft.export.graph import GraphOptions, build_tab_graph, load_tabs_from_windows
+from weft.utils.jsonio import write_json
+
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pretty", action="store_true", help="Indent the output JSON for reading")
+    args = ap.parse_args()
+
     # Load raw export
-    with open("weft_graph.json", "r") as f:
-        windows = json.load(f)
+    if orjson is not None:
+        # orjson parses the raw bytes directly, skipping the UTF-8 decode to str.
+        with open("weft_graph.json", "rb") as f:
+            windows = orjson.loads(f.read())
+    else:
+        with open("weft_graph.json", "r", encoding="utf-8") as f:
+            windows = json.load(f)
 
     print(f"Loaded {len(windows)} windows")
 
@@ -27,8 +44,8 @@ def main():
     graph = build_tab_graph(tabs, options)
 
     # Write output
-    with open(options.out, "w", encoding="utf-8") as f:
-        json.dump(graph, f, ensure_ascii=False, indent=2)
+    # The processed graph is read by tooling, so it is written compact by default.
+    write_json(options.out, graph, pretty=args.pretty)
 
     stats = graph["stats"]
     print(f"\n[OK] Wrote {options.out}")
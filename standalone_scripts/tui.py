@@ -198,8 +198,8 @@ class TabGraphApp(App):
         group = self.group_by_id.get(self.selected_group_id)
         if not group:
             return
-        urls = [self.tab_by_id.get(tid, {}).get("url") for tid in group.get("tab_ids", [])]
-        urls = [u for u in urls if u]
+        get_tab = self.tab_by_id.get
+        urls = [url for tid in group.get("tab_ids", []) if (url := get_tab(tid, {}).get("url"))]
         if not urls:
             return
         try:
@@ -470,8 +470,8 @@ class GraphScreen(Screen):
         group = self.group_by_id.get(self.selected_group_id)
         if not group:
             return
-        urls = [self.tab_by_id.get(tid, {}).get("url") for tid in group.get("tab_ids", [])]
-        urls = [u for u in urls if u]
+        get_tab = self.tab_by_id.get
+        urls = [url for tid in group.get("tab_ids", []) if (url := get_tab(tid, {}).get("url"))]
         if not urls:
             return
         try:
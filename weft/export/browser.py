@@ -135,7 +135,8 @@ def export_firefox(
     if raw[:8] != b"mozLz40\x00":
         raise RuntimeError("Unexpected Firefox sessionstore header; not mozlz4.")
 
-    decomp = lz4_decompress(raw[8:])
+    # memoryview drops the header without copying the compressed payload.
+    decomp = lz4_decompress(memoryview(raw)[8:])
     session = json.loads(decomp.decode("utf-8"))
 
     windows = session.get("windows", [])
@@ -4,6 +4,8 @@ import math
 from collections import Counter
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
 from weft.utils.text import hamming_distance, jaccard, tokenize
 from weft.utils.url import canonicalize_url
 
@@ -24,7 +26,8 @@ def cosine_similarity(a: Optional[List[float]], b: Optional[List[float]]) -> flo
 
 def similarity_score(ta: Dict, tb: Dict, domain_bonus: float) -> float:
     """Compute similarity score between two tabs."""
-    similarity = cosine_similarity(ta.get("embedding"), tb.get("embedding"))
+    emb_a, emb_b = ta.get("embedding"), tb.get("embedding")
+    similarity = cosine_similarity(emb_a, emb_b) if emb_a and emb_b else 0.0
     if similarity == 0.0:
         similarity = jaccard(ta.get("keywords", []), tb.get("keywords", []))
     if ta.get("domain") and ta.get("domain") == tb.get("domain"):
@@ -32,46 +35,97 @@ def similarity_score(ta: Dict, tb: Dict, domain_bonus: float) -> float:
     return similarity
 
 
-def build_similarity_matrix(tabs: List[Dict], domain_bonus: float) -> List[List[float]]:
-    """Build pairwise similarity matrix for all tabs."""
+def build_similarity_matrix(tabs: List[Dict], domain_bonus: float) -> np.ndarray:
+    """Build pairwise similarity matrix for all tabs as a contiguous float32 array.
+
+    Scores match similarity_score, computed with one GEMM for cosine (per embedding
+    size) and one over a keyword incidence matrix for the Jaccard fallback.
+    """
     count = len(tabs)
-    matrix = [[0.0 for _ in range(count)] for _ in range(count)]
-    for i in range(count):
-        for j in range(i + 1, count):
-            score = similarity_score(tabs[i], tabs[j], domain_bonus)
-            matrix[i][j] = score
-            matrix[j][i] = score
-    return matrix
+    # Scored in float64 like similarity_score, then stored as float32.
+    matrix = np.zeros((count, count), dtype=np.float64)
+
+    # Embeddings of different sizes come from different models and score 0.
+    by_dim: Dict[int, List[int]] = {}
+    for idx, tab in enumerate(tabs):
+        embedding = tab.get("embedding")
+        if embedding:
+            by_dim.setdefault(len(embedding), []).append(idx)
+    for indices in by_dim.values():
+        vectors = np.asarray([tabs[i]["embedding"] for i in indices], dtype=np.float64)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        matrix[np.ix_(indices, indices)] = vectors @ vectors.T
+    np.fill_diagonal(matrix, 0.0)
+
+    # Pairs without a cosine score fall back to keyword Jaccard.
+    fallback = matrix == 0.0
+    np.fill_diagonal(fallback, False)
+    need = np.flatnonzero(fallback.any(axis=1))
+    if need.size:
+        vocab: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, idx in enumerate(need.tolist()):
+            for word in set(tabs[idx].get("keywords", [])):
+                rows.append(row)
+                cols.append(vocab.setdefault(word, len(vocab)))
+        incidence = np.zeros((need.size, len(vocab)), dtype=np.float64)
+        incidence[rows, cols] = 1.0
+        inter = incidence @ incidence.T
+        sizes = incidence.sum(axis=1)
+        union = sizes[:, None] + sizes[None, :] - inter
+        jaccard_scores = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        block = np.ix_(need, need)
+        sub = matrix[block]
+        sub_fallback = fallback[block]
+        sub[sub_fallback] = jaccard_scores[sub_fallback]
+        matrix[block] = sub
+
+    if domain_bonus:
+        domain_ids: Dict[str, int] = {}
+        codes = np.array(
+            [domain_ids.setdefault(t["domain"], len(domain_ids)) if t.get("domain") else -1 for t in tabs],
+            dtype=np.int64,
+        )
+        same_domain = (codes[:, None] == codes[None, :]) & (codes[:, None] >= 0)
+        np.fill_diagonal(same_domain, False)
+        matrix[same_domain] += domain_bonus
+    return matrix.astype(np.float32)
+
+
+def pairs_above(similarity_matrix: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Row-major (i, j) index arrays for i < j with similarity >= threshold."""
+    return np.nonzero(np.triu(similarity_matrix >= threshold, k=1))
 
 
 def build_edges(
     tabs: List[Dict],
-    similarity_matrix: List[List[float]],
+    similarity_matrix: np.ndarray,
     threshold: float,
 ) -> List[Dict]:
     """Build graph edges from similarity matrix."""
     edges: List[Dict] = []
-    for i in range(len(tabs)):
-        for j in range(i + 1, len(tabs)):
-            weight = similarity_matrix[i][j]
-            if weight >= threshold:
-                reason = "similarity"
-                if tabs[i].get("domain") == tabs[j].get("domain"):
-                    reason = "similarity+domain"
-                edges.append(
-                    {
-                        "source": tabs[i]["id"],
-                        "target": tabs[j]["id"],
-                        "weight": round(weight, 3),
-                        "reason": reason,
-                    }
-                )
+    rows, cols = pairs_above(similarity_matrix, threshold)
+    weights = similarity_matrix[rows, cols].tolist()
+    for i, j, weight in zip(rows.tolist(), cols.tolist(), weights):
+        reason = "similarity"
+        if tabs[i].get("domain") == tabs[j].get("domain"):
+            reason = "similarity+domain"
+        edges.append(
+            {
+                "source": tabs[i]["id"],
+                "target": tabs[j]["id"],
+                "weight": round(weight, 3),
+                "reason": reason,
+            }
+        )
     return edges
 
 
 def build_groups(
     tabs: List[Dict],
-    similarity_matrix: List[List[float]],
+    similarity_matrix: np.ndarray,
     threshold: float,
     domain_group: bool,
     domain_group_min: int,
@@ -109,7 +163,8 @@ def build_groups(
     if mutual_knn:
         neighbors = []
         for i in range(len(tabs)):
-            scored = [(j, similarity_matrix[i][j]) for j in range(len(tabs)) if j != i]
+            row = similarity_matrix[i].tolist()
+            scored = [(j, row[j]) for j in range(len(tabs)) if j != i]
             scored.sort(key=lambda t: t[1], reverse=True)
             filtered = [j for j, score in scored if score >= threshold]
             if knn_k > 0:
@@ -120,10 +175,9 @@ def build_groups(
                 if i in neighbors[j]:
                     union(i, j)
     else:
-        for i in range(len(tabs)):
-            for j in range(i + 1, len(tabs)):
-                if similarity_matrix[i][j] >= threshold:
-                    union(i, j)
+        rows, cols = pairs_above(similarity_matrix, threshold)
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            union(i, j)
 
     # Collect groups
     groups_map: Dict[int, List[int]] = {}
@@ -0,0 +1,24 @@
+"""JSON file output, using orjson when it is installed."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def write_json(path: str, data: Any, pretty: bool = False) -> None:
+    """Write UTF-8 JSON (compact unless pretty), serializing in one C call when orjson is available."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if pretty else 0)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=option))
+        return
+    # json.dump emits one small write per token; a 1 MiB buffer coalesces them.
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        if pretty:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
@@ -3,7 +3,7 @@
 import hashlib
 import re
 from collections import Counter
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 STOPWORDS = {
     "a", "about", "above", "after", "again", "against", "all", "am", "an", "and", "any", "are",
@@ -61,9 +61,10 @@ def extract_keywords(text: str, max_keywords: int) -> List[str]:
     return [w for w, _ in counts.most_common(max_keywords)]
 
 
-def jaccard(a: List[str], b: List[str]) -> float:
-    """Compute Jaccard similarity between two lists."""
-    set_a, set_b = set(a), set(b)
+def jaccard(a: Iterable[str], b: Iterable[str]) -> float:
+    """Compute Jaccard similarity between two token collections (frozensets are used as-is)."""
+    set_a = a if isinstance(a, frozenset) else set(a)
+    set_b = b if isinstance(b, frozenset) else set(b)
     if not set_a or not set_b:
         return 0.0
     return len(set_a & set_b) / len(set_a | set_b)